@@ -9,6 +9,8 @@ def list_commands():
         "optimize_memory - Optimize memory usage",
         "clean_disk - Clean up disk space",
         "manage_startup - Manage startup applications",
-        "apply_tweaks - Apply system tweaks",
-        "reset_tweaks - Reset system tweaks"
+        "apply_tweaks - Apply a performance profile",
+        "reset_tweaks - Reset system tweaks",
+        "list_profiles - List performance profiles",
+        "auto_tune - Adapt kernel tunables to the current workload"
     ]
\ No newline at end of file
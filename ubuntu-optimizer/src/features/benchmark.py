@@ -0,0 +1,308 @@
+import os
+import json
+import math
+import time
+import random
+import socket
+import hashlib
+import tempfile
+import statistics
+import subprocess
+from .instrumentation import tracer
+
+# Two-sided 95% critical values of Student's t distribution by degrees of freedom.
+# Degrees of freedom between two keys use the lower key (a slightly wider interval).
+T_CRITICAL_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571,
+    6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228,
+    15: 2.131, 20: 2.086, 30: 2.042
+}
+
+DEFAULT_WORKLOADS = {
+    "cpu": {"rounds": 200},
+    "memory": {"size_mb": 64},
+    "file_io": {"size_mb": 16},
+    "process_spawn": {"count": 20}
+}
+
+
+def cpu_workload(rounds=200):
+    """Hash a 64KB block repeatedly"""
+    block = b"\x5a" * 65536
+    digest = hashlib.sha256()
+    for _ in range(rounds):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def memory_workload(size_mb=64):
+    """Allocate a buffer and touch every page of it"""
+    size = size_mb * 1024 * 1024
+    buffer = bytearray(size)
+    for offset in range(0, size, 4096):
+        buffer[offset] = 1
+    return len(buffer)
+
+
+def file_io_workload(size_mb=16, directory=None):
+    """Write a file in 1MB chunks, fsync it and read it back"""
+    chunk = os.urandom(1024 * 1024)
+    fd, path = tempfile.mkstemp(prefix="uo-bench-", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for _ in range(size_mb):
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(path, 'rb') as f:
+            while f.read(1024 * 1024):
+                pass
+    finally:
+        os.remove(path)
+    return size_mb
+
+
+def process_spawn_workload(count=20):
+    """Spawn and reap a trivial process several times"""
+    for _ in range(count):
+        subprocess.run(["true"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return count
+
+
+WORKLOAD_FUNCTIONS = {
+    "cpu": cpu_workload,
+    "memory": memory_workload,
+    "file_io": file_io_workload,
+    "process_spawn": process_spawn_workload
+}
+
+
+def summarize(samples):
+    """Return mean, standard deviation and 95% confidence interval of samples"""
+    mean = statistics.mean(samples)
+    stdev = statistics.stdev(samples) if len(samples) > 1 else 0.0
+    if len(samples) > 1:
+        df = len(samples) - 1
+        keys = [k for k in T_CRITICAL_95 if k <= df]
+        t_value = T_CRITICAL_95[max(keys)] if df <= 30 else 1.96
+        margin = t_value * stdev / (len(samples) ** 0.5)
+    else:
+        margin = 0.0
+
+    return {
+        "samples": samples,
+        "mean": mean,
+        "stdev": stdev,
+        "ci95_low": mean - margin,
+        "ci95_high": mean + margin
+    }
+
+
+def _beta_continued_fraction(a, b, x):
+    """Continued fraction of the incomplete beta function (modified Lentz's method)"""
+    tiny = 1e-300
+    c = 1.0
+    d = 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 300):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= c * d
+        if abs(c * d - 1.0) < 1e-12:
+            break
+    return result
+
+
+def _regularized_beta(a, b, x):
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - front * _beta_continued_fraction(b, a, 1 - x) / b
+
+
+def welch_p_value(a, b):
+    """Two-sided p-value of Welch's t-test that samples a and b have the same mean"""
+    var_a = statistics.variance(a) / len(a)
+    var_b = statistics.variance(b) / len(b)
+    difference = statistics.mean(b) - statistics.mean(a)
+    if var_a + var_b == 0:
+        return 1.0 if difference == 0 else 0.0
+
+    t = difference / math.sqrt(var_a + var_b)
+    df = (var_a + var_b) ** 2 / (var_a ** 2 / (len(a) - 1) + var_b ** 2 / (len(b) - 1))
+    return _regularized_beta(df / 2, 0.5, df / (df + t * t))
+
+
+def compare(before, after, alpha=0.05, min_effect=5.0):
+    """
+    Compare two summaries of elapsed times (lower is better)
+
+    A change counts only if Welch's t-test rejects equal means at level alpha and the
+    mean moved by at least min_effect percent.
+    """
+    change = ((after["mean"] - before["mean"]) / before["mean"] * 100) if before["mean"] else 0.0
+
+    if len(before["samples"]) < 2 or len(after["samples"]) < 2:
+        p_value = None
+        verdict = "inconclusive"
+    else:
+        p_value = welch_p_value(before["samples"], after["samples"])
+        if p_value >= alpha or abs(change) < min_effect:
+            verdict = "inconclusive"
+        else:
+            verdict = "improved" if change < 0 else "regressed"
+
+    return {"before": before, "after": after, "change_percent": change,
+            "p_value": p_value, "alpha": alpha, "verdict": verdict}
+
+
+class OptimizationBenchmark:
+    def __init__(self, workloads=None, repeats=3, blocks=4, warmup=1, alpha=0.05, min_effect=5.0,
+                 results_dir=None):
+        """
+        Measure synthetic workloads before and after an optimization action
+
+        Parameters:
+        - workloads: Mapping of workload name to its parameters (defaults to DEFAULT_WORKLOADS)
+        - repeats: Number of measured runs of each workload per block
+        - blocks: Number of blocks on each side of the action (at least 2)
+        - warmup: Number of unmeasured runs before measuring
+        - alpha: Significance level shared by all workloads (Bonferroni corrected)
+        - min_effect: Smallest change in percent reported as an improvement or regression
+        - results_dir: Where reports are saved
+        """
+        if blocks < 2:
+            raise ValueError("At least 2 blocks per side are needed to estimate the noise between blocks")
+        if repeats < 1:
+            raise ValueError("At least 1 repeat per block is needed")
+        self.workloads = workloads if workloads is not None else dict(DEFAULT_WORKLOADS)
+        self.repeats = repeats
+        self.blocks = blocks
+        self.warmup = warmup
+        self.alpha = alpha
+        self.min_effect = min_effect
+        self._random = random.Random()
+        self.results_dir = results_dir or os.path.expanduser("~/.config/ubuntu-optimizer/benchmarks")
+        os.makedirs(self.results_dir, exist_ok=True)
+
+        for name in self.workloads:
+            if name not in WORKLOAD_FUNCTIONS:
+                raise ValueError(f"Unknown workload '{name}'. Available: {', '.join(WORKLOAD_FUNCTIONS)}")
+
+    def run_workloads(self):
+        """
+        Run one block of every configured workload and return elapsed seconds per run
+
+        Workloads are interleaved in a new random order each round so slow drift in
+        caches or CPU frequency spreads over all of them instead of hitting the last one.
+        """
+        names = list(self.workloads)
+        for _ in range(self.warmup):
+            for name in names:
+                WORKLOAD_FUNCTIONS[name](**self.workloads[name])
+
+        results = {name: [] for name in names}
+        for _ in range(self.repeats):
+            self._random.shuffle(names)
+            for name in names:
+                start = time.perf_counter()
+                WORKLOAD_FUNCTIONS[name](**self.workloads[name])
+                results[name].append(time.perf_counter() - start)
+
+        return results
+
+    def benchmark_action(self, action_name, action):
+        """
+        Run blocks of workloads, call action(), run as many blocks again and build a report
+
+        An action can only be applied once, so before and after runs can't be
+        interleaved. Each workload is instead compared on the medians of its blocks:
+        the spread between blocks on the same side of the action reflects the drift
+        that happens without any change, so only effects larger than that are reported.
+        The significance level is split between workloads (Bonferroni).
+        """
+        before_blocks = [self.run_workloads() for _ in range(self.blocks)]
+        try:
+            action_result = action()
+            action_error = None
+        except Exception as e:
+            action_result = None
+            action_error = str(e)
+        after_blocks = [self.run_workloads() for _ in range(self.blocks)]
+
+        alpha = self.alpha / len(self.workloads)
+        workloads = {}
+        for name in self.workloads:
+            before = [statistics.median(block[name]) for block in before_blocks]
+            after = [statistics.median(block[name]) for block in after_blocks]
+            workloads[name] = compare(summarize(before), summarize(after), alpha, self.min_effect)
+            workloads[name]["params"] = self.workloads[name]
+
+        verdicts = [result["verdict"] for result in workloads.values()]
+        if "regressed" in verdicts:
+            verdict = "regressed"
+        elif "improved" in verdicts:
+            verdict = "improved"
+        else:
+            verdict = "inconclusive"
+
+        return {
+            "action": action_name,
+            "host": socket.gethostname(),
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "repeats": self.repeats,
+            "blocks": self.blocks,
+            "alpha": self.alpha,
+            "min_effect_percent": self.min_effect,
+            "action_result": None if action_result is None else str(action_result),
+            "action_error": action_error,
+            "workloads": workloads,
+            "verdict": verdict
+        }
+
+    def benchmark_named_action(self, action, target=None):
+        """Benchmark one of the optimizer actions by name"""
+        return self.benchmark_action(self._action_label(action, target), self._resolve_action(action, target))
+
+    @tracer.traced("file")
+    def save_report(self, report):
+        """Save a report as JSON and return its path"""
+        filename = f"{report['action'].replace(':', '_')}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        path = os.path.join(self.results_dir, filename)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return path
+
+    def _action_label(self, action, target):
+        return f"{action}:{target}" if target else action
+
+    def _resolve_action(self, action, target):
+        """Map an action name to a callable performing it"""
+        if action == "service":
+            if not target:
+                raise ValueError("The 'service' action needs a service name")
+            from .service_optimizer import ServiceOptimizer
+            return lambda: ServiceOptimizer().optimize_service(target)
+        elif action == "memory":
+            from .memory_optimization import MemoryOptimizer
+            return MemoryOptimizer().optimize_memory
+        elif action == "tweaks":
+            from .system_tweaks import SystemTweaks, PROFILES
+            if target not in PROFILES:
+                problem = f"Unknown profile '{target}'" if target else "No profile given"
+                raise ValueError(f"{problem}. The 'tweaks' action needs one of: {', '.join(PROFILES)}")
+            return lambda: SystemTweaks().apply_tweaks(target)
+        elif action == "disk":
+            from .disk_cleanup import DiskCleaner
+            return DiskCleaner().clean_disk
+        else:
+            raise ValueError(f"Unknown action '{action}'. Available: service, memory, tweaks, disk")
@@ -1,6 +1,7 @@
 import os
 import subprocess
 import json
+from .instrumentation import tracer
 
 class ShortcutManager:
     def __init__(self):
@@ -93,6 +94,7 @@ class ShortcutManager:
         except Exception as e:
             return f"Error removing shortcut: {str(e)}"
     
+    @tracer.traced("file")
     def _load_shortcuts(self):
         """Load shortcuts from file"""
         try:
@@ -101,6 +103,7 @@ class ShortcutManager:
         except:
             return {}
             
+    @tracer.traced("file")
     def _save_shortcuts(self, shortcuts):
         """Save shortcuts to file"""
         with open(self.shortcuts_file, 'w') as f:
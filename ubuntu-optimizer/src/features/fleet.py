@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import shlex
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from .instrumentation import tracer
+
+DEFAULT_REMOTE_COMMAND = ["python3", "ubuntu-optimizer/src/main.py"]
+
+class SSHExecutor:
+    """Run commands over OpenSSH, sharing one master connection per host"""
+
+    def __init__(self, control_dir=None, connect_timeout=10, persist=300, ssh_options=None):
+        self.control_dir = control_dir or os.path.expanduser("~/.config/ubuntu-optimizer/fleet/sockets")
+        os.makedirs(self.control_dir, exist_ok=True)
+        self.connect_timeout = connect_timeout
+        self.persist = persist
+        self.ssh_options = ssh_options or []
+
+    def run(self, host, argv, timeout=None):
+        """Run argv on host and return (returncode, stdout, stderr)"""
+        remote = " ".join(shlex.quote(arg) for arg in argv)
+        completed = subprocess.run(self._ssh_args(host) + [self._target(host), remote],
+                                   stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE,
+                                   universal_newlines=True,
+                                   timeout=timeout)
+        return completed.returncode, completed.stdout, completed.stderr
+
+    def close(self, host):
+        """Stop the master connection of host"""
+        subprocess.run(self._ssh_args(host) + ["-O", "exit", self._target(host)],
+                       stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+
+    def _ssh_args(self, host):
+        args = ["ssh",
+                "-o", "BatchMode=yes",
+                "-o", f"ConnectTimeout={self.connect_timeout}",
+                "-o", "ControlMaster=auto",
+                "-o", f"ControlPath={os.path.join(self.control_dir, '%C')}",
+                "-o", f"ControlPersist={self.persist}"]
+        if host.get("port"):
+            args += ["-p", str(host["port"])]
+        for option in self.ssh_options:
+            args += ["-o", option]
+        return args
+
+    def _target(self, host):
+        return f"{host['user']}@{host['address']}" if host.get("user") else host["address"]
+
+class LocalExecutor:
+    """Run commands on this machine, standing in for SSH in tests and dry runs"""
+
+    def run(self, host, argv, timeout=None):
+        completed = subprocess.run(argv,
+                                   stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE,
+                                   universal_newlines=True,
+                                   timeout=timeout)
+        return completed.returncode, completed.stdout, completed.stderr
+
+    def close(self, host):
+        pass
+
+class FleetRunner:
+    def __init__(self, inventory, executor=None, max_parallel=None, timeout=600, results_dir=None):
+        """
+        Run optimizer commands on many hosts
+
+        Parameters:
+        - inventory: Path to a JSON inventory or the inventory itself, e.g.
+          {"remote_command": ["python3", "/opt/ubuntu-optimizer/src/main.py"],
+           "max_parallel": 20,
+           "hosts": ["web1", {"name": "db1", "address": "10.0.0.5", "user": "ops", "port": 2222}]}
+        - executor: Object with run(host, argv, timeout) and close(host) (defaults to SSHExecutor)
+        - max_parallel: Maximum number of hosts handled at once (overrides the inventory)
+        - timeout: Seconds allowed per host and command
+
+        Raises OSError if the inventory file can't be read and ValueError if it isn't valid.
+        """
+        if isinstance(inventory, str):
+            with open(inventory, 'r') as f:
+                inventory = json.load(f)
+        if not isinstance(inventory, dict) or not inventory.get("hosts"):
+            raise ValueError("Inventory must be a JSON object with a non-empty \"hosts\" list")
+
+        self.hosts = [self._parse_host(host) for host in inventory.get("hosts", [])]
+        self.remote_command = inventory.get("remote_command", DEFAULT_REMOTE_COMMAND)
+        if isinstance(self.remote_command, str):
+            self.remote_command = shlex.split(self.remote_command)
+        self.max_parallel = max_parallel or inventory.get("max_parallel", 10)
+        self.executor = executor or SSHExecutor()
+        self.timeout = timeout
+        self.results_dir = results_dir or os.path.expanduser("~/.config/ubuntu-optimizer/fleet")
+        os.makedirs(self.results_dir, exist_ok=True)
+
+    def run(self, command, *args):
+        """Run a main.py command on every host and return one result per host, in inventory order"""
+        return [host_results[0] for host_results in self.run_sequence([[command] + list(args)])]
+
+    def run_sequence(self, commands):
+        """
+        Run several main.py commands on every host, one after another
+
+        Each host's commands share one connection and stop at the first failure.
+        Returns a list of results per host, in inventory order.
+        """
+        argvs = [self.remote_command + [str(arg) for arg in command] for command in commands]
+
+        def run_host(host):
+            results = []
+            for argv in argvs:
+                results.append(self._run_on_host(host, argv))
+                if not results[-1]["ok"]:
+                    break
+            return results
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_parallel)) as pool:
+            return list(pool.map(run_host, self.hosts))
+
+    def close(self):
+        """
+        Close the connections kept open between commands
+
+        Without this, SSH master connections stay open until ControlPersist expires so
+        later invocations can reuse them.
+        """
+        for host in self.hosts:
+            try:
+                self.executor.close(host)
+            except Exception:
+                pass
+
+    def summarize(self, results):
+        """Format results as a table with one row per host and command"""
+        commands = [" ".join(result["command"][len(self.remote_command):]) for result in results]
+        width = max([len("HOST")] + [len(result["host"]) for result in results])
+        command_width = max([len("COMMAND")] + [len(command) for command in commands])
+        lines = [f"{'HOST':<{width}}  {'COMMAND':<{command_width}}  {'STATUS':<7}  {'TIME':>7}  OUTPUT"]
+
+        failed_hosts = set()
+        for result, command in zip(results, commands):
+            status = "ok" if result["ok"] else "failed"
+            if not result["ok"]:
+                failed_hosts.add(result["host"])
+            output = result["error"] or result["stdout"].strip() or result["stderr"].strip()
+            first_line = output.split("\n")[0] if output else ""
+            lines.append(f"{result['host']:<{width}}  {command:<{command_width}}  {status:<7}  "
+                         f"{result['duration']:>6.1f}s  {first_line}")
+
+        hosts = len(set(result["host"] for result in results))
+        lines.append(f"{hosts} hosts: {hosts - len(failed_hosts)} ok, {len(failed_hosts)} failed")
+        return "\n".join(lines)
+
+    @tracer.traced("file")
+    def save_results(self, results):
+        """Save results as JSON and return its path"""
+        path = os.path.join(self.results_dir, f"results-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+        return path
+
+    def _run_on_host(self, host, argv):
+        result = {
+            "host": host["name"],
+            "command": argv,
+            "ok": False,
+            "returncode": None,
+            "stdout": "",
+            "stderr": "",
+            "data": None,
+            "error": None,
+            "duration": 0.0
+        }
+
+        start = time.monotonic()
+        try:
+            returncode, stdout, stderr = self.executor.run(host, argv, timeout=self.timeout)
+            result.update(returncode=returncode, stdout=stdout, stderr=stderr, ok=returncode == 0,
+                          data=self._parse_data(stdout))
+        except subprocess.TimeoutExpired:
+            result["error"] = f"Timed out after {self.timeout}s"
+        except Exception as e:
+            result["error"] = str(e)
+        result["duration"] = time.monotonic() - start
+
+        return result
+
+    def _parse_data(self, stdout):
+        """Return the JSON object a command printed first (like metrics or benchmark), or None"""
+        stdout = stdout.lstrip()
+        if not stdout.startswith("{"):
+            return None
+        try:
+            return json.JSONDecoder().raw_decode(stdout)[0]
+        except ValueError:
+            return None
+
+    def _parse_host(self, host):
+        """Accept 'name', 'user@name' or {'name', 'address', 'user', 'port'}"""
+        if isinstance(host, str):
+            user, _, address = host.rpartition("@")
+            host = {"name": host, "address": address, "user": user or None}
+        host = dict(host)
+        host.setdefault("address", host.get("name"))
+        host.setdefault("name", host["address"])
+        return host
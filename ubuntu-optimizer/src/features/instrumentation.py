@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import threading
+import functools
+import subprocess
+from contextlib import contextmanager
+
+PROFILE_MODES = ["summary", "cprofile", "chrome"]
+
+class Tracer:
+    """
+    Collect timed spans and counters while a command runs
+
+    Spans are only recorded between start() and stop(), so the hooks left in the
+    feature modules cost a flag check otherwise. start() also wraps subprocess.Popen
+    and os.system so every spawned process is timed and counted.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = []
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._originals = {}
+
+    def start(self):
+        """Clear previous data and start recording"""
+        self.spans = []
+        self.counters = {}
+        self._origin = time.perf_counter()
+        self._install_hooks()
+        self.enabled = True
+
+    def stop(self):
+        """Stop recording and remove the subprocess hooks"""
+        self.enabled = False
+        self._remove_hooks()
+
+    @contextmanager
+    def span(self, name, category="phase"):
+        """Time the enclosed block"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, category, start, time.perf_counter() - start)
+
+    def traced(self, category):
+        """Decorator timing every call of a function under its name"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(func.__name__, category):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, category, start, duration):
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "category": category,
+                "start": start - self._origin,
+                "duration": duration,
+                "thread": threading.get_ident()
+            })
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self):
+        """Format the time spent per category and span name"""
+        phases = {}
+        for span in self.spans:
+            key = (span["category"], span["name"])
+            calls, total = phases.get(key, (0, 0.0))
+            phases[key] = (calls + 1, total + span["duration"])
+
+        width = max([len("PHASE")] + [len(f"{category} {name}") for category, name in phases])
+        lines = [f"{'PHASE':<{width}}  {'CALLS':>6}  {'TOTAL ms':>10}"]
+        for (category, name), (calls, total) in sorted(phases.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{category + ' ' + name:<{width}}  {calls:>6}  {total * 1000:>10.1f}")
+
+        if self.counters:
+            lines.append("Counters: " + ", ".join(f"{name}={value}" for name, value in sorted(self.counters.items())))
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, path):
+        """Write spans in the Chrome trace event format (chrome://tracing, Perfetto)"""
+        events = [{
+            "name": span["name"],
+            "cat": span["category"],
+            "ph": "X",
+            "ts": span["start"] * 1e6,
+            "dur": span["duration"] * 1e6,
+            "pid": os.getpid(),
+            "tid": span["thread"]
+        } for span in self.spans]
+
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": self.counters}, f)
+
+    def _install_hooks(self):
+        if self._originals:
+            return
+        tracer = self
+        original_popen = subprocess.Popen
+        original_system = os.system
+
+        class TracedPopen(original_popen):
+            def __init__(self, args, *popen_args, **popen_kwargs):
+                self._trace_name = program_name(args)
+                self._trace_start = time.perf_counter()
+                self._trace_done = False
+                tracer.count("subprocess")
+                super().__init__(args, *popen_args, **popen_kwargs)
+
+            def wait(self, timeout=None):
+                returncode = super().wait(timeout=timeout)
+                if not self._trace_done and tracer.enabled:
+                    self._trace_done = True
+                    tracer.record(self._trace_name, "subprocess", self._trace_start,
+                                  time.perf_counter() - self._trace_start)
+                return returncode
+
+        def traced_system(command):
+            tracer.count("subprocess")
+            with tracer.span(program_name(command), "subprocess"):
+                return original_system(command)
+
+        self._originals = {"Popen": original_popen, "system": original_system}
+        subprocess.Popen = TracedPopen
+        os.system = traced_system
+
+    def _remove_hooks(self):
+        if not self._originals:
+            return
+        subprocess.Popen = self._originals["Popen"]
+        os.system = self._originals["system"]
+        self._originals = {}
+
+# Shared by all feature modules
+tracer = Tracer()
+
+
+def program_name(args):
+    """Name a spawned program after its executable, without ever failing on odd arguments"""
+    try:
+        program = args if isinstance(args, (str, bytes, os.PathLike)) else args[0]
+        words = os.fsdecode(os.fspath(program)).split()
+        return os.path.basename(words[0]) if words else "?"
+    except Exception:
+        return "?"
+
+
+def check_profile_mode(mode):
+    """Raise ValueError unless mode is a valid --profile value"""
+    kind = mode.partition(":")[0]
+    if kind not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{kind}'. Available: {', '.join(PROFILE_MODES)}")
+
+
+def run_profiled(func, mode="summary"):
+    """
+    Run func with tracing enabled and return the per-phase breakdown
+
+    mode is "summary", "cprofile[:path]" (dump cProfile stats) or "chrome[:path]"
+    (write a Chrome trace).
+    """
+    check_profile_mode(mode)
+    kind, _, path = mode.partition(":")
+
+    profiler = None
+    if kind == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+
+    tracer.start()
+    try:
+        with tracer.span("total", "command"):
+            if profiler:
+                profiler.runcall(func)
+            else:
+                func()
+    finally:
+        tracer.stop()
+
+    report = tracer.summary()
+    if kind == "cprofile":
+        path = path or "ubuntu-optimizer.prof"
+        profiler.dump_stats(path)
+        report += f"\ncProfile stats written to {path}"
+    elif kind == "chrome":
+        path = path or "ubuntu-optimizer-trace.json"
+        tracer.write_chrome_trace(path)
+        report += f"\nChrome trace written to {path}"
+    return report
@@ -0,0 +1,228 @@
+import os
+import json
+import time
+from .instrumentation import tracer
+
+# Processes that are never throttled, whatever their CPU usage
+DEFAULT_ALLOWLIST = [
+    "systemd", "systemd-journald", "systemd-logind", "sshd", "dbus-daemon", "login",
+    "Xorg", "Xwayland", "gnome-shell", "gdm", "gdm3", "pipewire", "pulseaudio", "wireplumber"
+]
+
+class ProcessThrottler:
+    def __init__(self, cgroup_root="/sys/fs/cgroup", proc_root="/proc", group_name="ubuntu-optimizer-throttle",
+                 cpu_quota=20, max_victims=5, allowlist=None, denylist=None, state_dir=None):
+        """
+        Limit the CPU of the heaviest processes with a cgroup v2 cpu.max quota
+
+        Parameters:
+        - cgroup_root: Mount point of the cgroup v2 hierarchy
+        - proc_root: Mount point of procfs
+        - group_name: Cgroup created under cgroup_root for throttled processes
+        - cpu_quota: Percentage of one CPU shared by all throttled processes
+        - max_victims: Maximum number of processes throttled per run
+        - allowlist: Process names that are never throttled
+        - denylist: If given, only these process names may be throttled
+        """
+        self.cgroup_root = cgroup_root
+        self.proc_root = proc_root
+        self.group_path = os.path.join(cgroup_root, group_name)
+        self.cpu_quota = cpu_quota
+        self.max_victims = max_victims
+        self.allowlist = set(DEFAULT_ALLOWLIST if allowlist is None else allowlist)
+        self.denylist = set(denylist or [])
+        self.state_dir = state_dir or os.path.expanduser("~/.config/ubuntu-optimizer/throttle")
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.state_file = os.path.join(self.state_dir, "throttled.json")
+
+    @tracer.traced("metrics")
+    def snapshot_processes(self, interval=1.0):
+        """Enumerate processes once and measure their CPU usage over an interval"""
+        import psutil
+
+        processes = list(psutil.process_iter(["name", "ppid"]))
+        for process in processes:
+            try:
+                process.cpu_percent(None)
+            except psutil.Error:
+                pass
+
+        time.sleep(interval)
+
+        snapshot = []
+        for process in processes:
+            try:
+                snapshot.append({
+                    "pid": process.pid,
+                    "name": process.info["name"],
+                    "ppid": process.info["ppid"],
+                    "cpu": process.cpu_percent(None)
+                })
+            except psutil.Error:
+                continue
+        return snapshot
+
+    def select_victims(self, processes, min_cpu=10.0):
+        """Pick the processes to throttle from a snapshot, heaviest first"""
+        throttled = self._load_state()
+        protected = {0, 1, 2, os.getpid(), os.getppid()}
+
+        candidates = []
+        for process in processes:
+            if process["pid"] in protected or process.get("ppid") == 2:  # kernel threads
+                continue
+            if str(process["pid"]) in throttled or process["name"] in self.allowlist:
+                continue
+            if self.denylist and process["name"] not in self.denylist:
+                continue
+            if process["cpu"] < min_cpu:
+                continue
+            candidates.append(process)
+
+        candidates.sort(key=lambda process: process["cpu"], reverse=True)
+        return candidates[:self.max_victims]
+
+    def throttle(self, processes=None, min_cpu=10.0):
+        """Move the selected processes into the throttling cgroup"""
+        if processes is None:
+            processes = self.snapshot_processes()
+        victims = self.select_victims(processes, min_cpu)
+        if not victims:
+            return "No processes to throttle"
+
+        try:
+            self._create_group()
+        except OSError as e:
+            return f"Failed to create throttling cgroup: {e.strerror or e}"
+
+        throttled = self._load_state()
+        results = []
+        for victim in victims:
+            original = self._get_cgroup(victim["pid"])
+            start_time = self._get_start_time(victim["pid"])
+            if original is None or start_time is None:
+                continue
+            try:
+                self._write(os.path.join(self.group_path, "cgroup.procs"), victim["pid"])
+            except OSError as e:
+                results.append(f"Failed to throttle {victim['name']} ({victim['pid']}): {e.strerror or e}")
+                continue
+            throttled[str(victim["pid"])] = {"name": victim["name"], "cgroup": original, "start_time": start_time}
+            results.append(f"Throttled {victim['name']} ({victim['pid']}) using {victim['cpu']:.1f}% CPU")
+
+        self._save_state(throttled)
+        return "\n".join(results)
+
+    def restore(self):
+        """
+        Move every throttled process back to its original cgroup
+
+        If the original cgroup is gone the closest surviving ancestor is used. Processes
+        that could not be moved stay recorded so a later run retries them.
+        """
+        throttled = self._load_state()
+        if not throttled:
+            return "No throttled processes"
+
+        remaining = {}
+        results = []
+        for pid, details in throttled.items():
+            start_time = self._get_start_time(pid)
+            if start_time is None or start_time != details.get("start_time", start_time):
+                # The process exited, possibly leaving its pid to an unrelated process
+                results.append(f"{details['name']} ({pid}) has exited")
+                continue
+
+            parts = [part for part in details["cgroup"].split("/") if part]
+            for depth in range(len(parts), -1, -1):
+                cgroup = "/".join(parts[:depth])
+                try:
+                    self._write(os.path.join(self.cgroup_root, cgroup, "cgroup.procs"), pid)
+                except OSError:
+                    continue
+                results.append(f"Restored {details['name']} ({pid}) to /{cgroup}")
+                break
+            else:
+                remaining[pid] = details
+                results.append(f"Could not restore {details['name']} ({pid})")
+
+        self._save_state(remaining)
+        if not remaining:
+            try:
+                os.rmdir(self.group_path)
+            except OSError:
+                pass
+        return "\n".join(results)
+
+    def run_once(self, threshold=80, restore_below=None, load=None):
+        """
+        Throttle when CPU usage is above threshold, restore once it drops below restore_below
+
+        restore_below defaults to 75% of threshold so processes aren't released as soon as
+        throttling itself brings the load down.
+        """
+        if restore_below is None:
+            restore_below = threshold * 0.75
+        if load is None:
+            import psutil
+            load = psutil.cpu_percent(interval=1)
+
+        if load > threshold:
+            return self.throttle()
+        if load < restore_below and self._load_state():
+            return self.restore()
+        return f"CPU usage {load:.1f}%, no action needed"
+
+    def _create_group(self):
+        """Create the throttling cgroup and set its cpu.max quota"""
+        try:
+            self._write(os.path.join(self.cgroup_root, "cgroup.subtree_control"), "+cpu")
+        except OSError:
+            pass  # Already enabled, or managed by systemd
+        os.makedirs(self.group_path, exist_ok=True)
+        period = 100000
+        self._write(os.path.join(self.group_path, "cpu.max"), f"{self.cpu_quota * period // 100} {period}")
+
+    @tracer.traced("file")
+    def _get_cgroup(self, pid):
+        """Return the cgroup v2 path of a process, or None if it is gone"""
+        try:
+            with open(os.path.join(self.proc_root, str(pid), "cgroup"), 'r') as f:
+                for line in f:
+                    if line.startswith("0::"):
+                        return line[3:].strip()
+        except OSError:
+            pass
+        return None
+
+    @tracer.traced("file")
+    def _get_start_time(self, pid):
+        """Return the start time of a process in clock ticks, or None if it is gone"""
+        try:
+            with open(os.path.join(self.proc_root, str(pid), "stat"), 'r') as f:
+                stat = f.read()
+        except OSError:
+            return None
+        # Fields after the parenthesized command name start at field 3 (state); starttime is field 22
+        fields = stat[stat.rfind(")") + 2:].split()
+        return fields[19] if len(fields) > 19 else None
+
+    @tracer.traced("file")
+    def _write(self, path, value):
+        with open(path, 'w') as f:
+            f.write(str(value))
+
+    @tracer.traced("file")
+    def _load_state(self):
+        """Load throttled processes from file"""
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except:
+            return {}
+
+    @tracer.traced("file")
+    def _save_state(self, throttled):
+        """Save throttled processes to file"""
+        with open(self.state_file, 'w') as f:
+            json.dump(throttled, f, indent=2)
@@ -2,6 +2,7 @@ import os
 import subprocess
 import json
 import psutil
+from .instrumentation import tracer
 
 class ServiceOptimizer:
     def __init__(self):
@@ -136,6 +137,7 @@ class ServiceOptimizer:
         else:
             return f"Service '{service_name}' is not in the disable list"
     
+    @tracer.traced("metrics")
     def _get_service_stats(self, service_name):
         """Get memory and CPU usage of a service"""
         try:
@@ -194,6 +196,7 @@ class ServiceOptimizer:
         except:
             return []
     
+    @tracer.traced("file")
     def _load_config(self):
         """Load configuration from file"""
         try:
@@ -202,6 +205,7 @@ class ServiceOptimizer:
         except:
             return {"monitored_services": [], "auto_restart": True, "services_to_disable": []}
     
+    @tracer.traced("file")
     def _save_config(self, config):
         """Save configuration to file"""
         with open(self.config_file, 'w') as f:
@@ -1,8 +1,412 @@
+import os
+import glob
+import json
+import time
+from .instrumentation import tracer
+
+# Performance profiles. "sysctl" keys are written under /proc/sys, "sysfs" keys are
+# glob patterns relative to /sys so per-device settings cover every matching device.
+PROFILES = {
+    "throughput_server": {
+        "description": "Large write-back batches and a stable clock for sustained throughput",
+        "sysctl": {
+            "vm.swappiness": "10",
+            "vm.dirty_ratio": "40",
+            "vm.dirty_background_ratio": "10",
+            "vm.vfs_cache_pressure": "50"
+        },
+        "sysfs": {
+            "block/*/queue/scheduler": "mq-deadline",
+            "kernel/mm/transparent_hugepage/enabled": "always",
+            "devices/system/cpu/cpu*/cpufreq/scaling_governor": "performance"
+        }
+    },
+    "low_latency_desktop": {
+        "description": "Small write-back bursts and a fair I/O scheduler for interactive use",
+        "sysctl": {
+            "vm.swappiness": "10",
+            "vm.dirty_ratio": "10",
+            "vm.dirty_background_ratio": "5",
+            "vm.vfs_cache_pressure": "50"
+        },
+        "sysfs": {
+            "block/*/queue/scheduler": "bfq",
+            "kernel/mm/transparent_hugepage/enabled": "madvise",
+            "devices/system/cpu/cpu*/cpufreq/scaling_governor": "schedutil"
+        }
+    },
+    "build_machine": {
+        "description": "Keeps source trees in the dentry/inode cache and the CPU at full speed",
+        "sysctl": {
+            "vm.swappiness": "30",
+            "vm.dirty_ratio": "30",
+            "vm.dirty_background_ratio": "10",
+            "vm.vfs_cache_pressure": "25"
+        },
+        "sysfs": {
+            "block/*/queue/scheduler": "mq-deadline",
+            "kernel/mm/transparent_hugepage/enabled": "madvise",
+            "devices/system/cpu/cpu*/cpufreq/scaling_governor": "performance"
+        }
+    }
+}
+
+# The kernel keeps only one of each pair: writing a ratio zeroes the byte limit and vice versa
+DIRTY_LIMIT_PAIRS = {
+    "vm.dirty_ratio": "vm.dirty_bytes",
+    "vm.dirty_background_ratio": "vm.dirty_background_bytes"
+}
+
+# Tunables the adaptive mode may change, each kept within [min, max] and moved one step at a time
+AUTO_TUNABLES = {
+    "vm.swappiness": {"min": 0, "max": 100, "step": 10},
+    "vm.vfs_cache_pressure": {"min": 25, "max": 200, "step": 25},
+    "vm.dirty_ratio": {"min": 5, "max": 60, "step": 5},
+    "vm.dirty_background_ratio": {"min": 2, "max": 30, "step": 2}
+}
+
+# Weights of the sampled metrics in the auto-tuning objective (lower is better)
+OBJECTIVE_WEIGHTS = {
+    "memory_pressure": 1.0,   # % of time some task stalled on memory (PSI)
+    "iowait": 1.0,            # % of CPU time spent waiting for I/O
+    "run_queue": 1.0,         # runnable tasks per CPU
+    "major_faults": 0.01      # major page faults per second
+}
+
 class SystemTweaks:
-    def apply_tweaks(self):
-        # Implement logic to apply system tweaks
-        pass
+    def __init__(self, proc_root="/proc", sysfs_root="/sys", state_dir=None):
+        self.proc_root = proc_root
+        self.sysfs_root = sysfs_root
+        self.state_dir = state_dir or os.path.expanduser("~/.config/ubuntu-optimizer/tweaks")
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.snapshot_file = os.path.join(self.state_dir, "snapshot.json")
+
+    def list_profiles(self):
+        """List the available performance profiles"""
+        result = "Available profiles:\n"
+        for name, profile in PROFILES.items():
+            result += f"- {name}: {profile['description']}\n"
+        return result
+
+    def apply_tweaks(self, profile=None):
+        """
+        Apply a performance profile
+
+        The current value of every setting is saved before it is first changed so
+        reset_tweaks can restore the system exactly, even after several profiles.
+        """
+        if profile is None:
+            return "No profile selected.\n" + self.list_profiles()
+        if profile not in PROFILES:
+            return f"Profile '{profile}' not found"
+
+        settings, skipped = self._resolve_profile(profile)
+
+        snapshot = self._load_snapshot()
+        self._snapshot_values(snapshot, settings)
+        snapshot["profile"] = profile
+        self._save_snapshot(snapshot)
+
+        failed = self._write_values(settings)
+        mismatched = [path for path in self._verify_values(settings) if path not in failed]
+
+        result = (f"Profile '{profile}' applied: {len(settings) - len(failed) - len(mismatched)} settings set, "
+                  f"{len(failed)} failed, {len(mismatched)} not verified, {len(skipped)} skipped")
+        for path, error in failed.items():
+            result += f"\nFailed to set {path}: {error}"
+        for path in mismatched:
+            result += f"\nValue of {path} did not change to {settings[path]}"
+        for path in skipped:
+            result += f"\nSkipped {path}: not supported on this system"
+        return result
+
+    def verify_tweaks(self, profile):
+        """Return the settings of a profile that don't currently hold their expected value"""
+        if profile not in PROFILES:
+            return f"Profile '{profile}' not found"
+        settings, _ = self._resolve_profile(profile)
+        return self._verify_values(settings)
 
     def reset_tweaks(self):
-        # Implement logic to reset system tweaks
-        pass
\ No newline at end of file
+        """Restore every setting saved before the first profile was applied"""
+        if not os.path.exists(self.snapshot_file):
+            return "No tweaks to reset"
+
+        snapshot = self._load_snapshot()
+        values = {path: value for path, value in snapshot["values"].items() if value is not None}
+
+        # Restore whichever dirty limit of each pair was in use, byte limits last since
+        # writing them zeroes the ratio (and writing a 0 byte limit would be rejected)
+        byte_limits = {}
+        for ratio_key, bytes_key in DIRTY_LIMIT_PAIRS.items():
+            bytes_path = self._sysctl_path(bytes_key)
+            if bytes_path not in values:
+                continue
+            bytes_value = values.pop(bytes_path)
+            if bytes_value != "0":
+                values.pop(self._sysctl_path(ratio_key), None)
+                byte_limits[bytes_path] = bytes_value
+        values.update(byte_limits)
+
+        failed = self._write_values(values)
+        mismatched = [path for path in self._verify_values(values) if path not in failed]
+        if failed or mismatched:
+            result = f"Tweaks partially reset: {len(failed) + len(mismatched)} of {len(values)} settings not restored"
+            for path, error in failed.items():
+                result += f"\nFailed to restore {path}: {error}"
+            for path in mismatched:
+                result += f"\nValue of {path} is not {values[path]}"
+            return result
+
+        os.remove(self.snapshot_file)
+        return f"Tweaks reset: {len(values)} settings restored"
+
+    def sample_metrics(self, interval=30, readings=10):
+        """
+        Measure memory pressure, I/O wait, run-queue length and page-fault rate over an interval
+
+        Cumulative counters are compared between the start and the end of the interval;
+        the run queue, which has no cumulative counter, is averaged over several readings.
+        """
+        start = self._read_counters()
+        running = []
+        for _ in range(readings):
+            time.sleep(interval / readings)
+            end = self._read_counters()
+            # procs_running includes this process while it reads /proc/stat
+            running.append(max(end["procs_running"] - 1, 0))
+
+        total = end["cpu_total"] - start["cpu_total"]
+        return {
+            "memory_pressure": (end["memory_stall_us"] - start["memory_stall_us"]) / (interval * 1e4) if interval > 0 else 0.0,
+            "iowait": (end["cpu_iowait"] - start["cpu_iowait"]) * 100.0 / total if total > 0 else 0.0,
+            "run_queue": sum(running) / len(running) / (os.cpu_count() or 1),
+            "major_faults": (end["major_faults"] - start["major_faults"]) / interval if interval > 0 else 0.0
+        }
+
+    def objective(self, metrics):
+        """Combine sampled metrics into one score, lower is better"""
+        return sum(weight * metrics.get(name, 0.0) for name, weight in OBJECTIVE_WEIGHTS.items())
+
+    def auto_tune(self, iterations=12, interval=30, tolerance=0.02, sampler=None):
+        """
+        Adjust AUTO_TUNABLES one step at a time while the workload runs
+
+        Each step moves one tunable, samples the metrics for an interval and keeps the
+        change only if the objective dropped by more than tolerance; otherwise the old
+        value is written back and the next attempt on that tunable goes the other way.
+        Original values go into the same snapshot as profiles, so reset_tweaks undoes
+        the whole session.
+
+        Parameters:
+        - iterations: Number of adjustments to try
+        - interval: Seconds of metrics sampled per measurement
+        - tolerance: Relative improvement required to keep a change
+        - sampler: Function taking the interval and returning metrics (defaults to sample_metrics)
+        """
+        sampler = sampler or self.sample_metrics
+
+        paths = {}
+        for key in AUTO_TUNABLES:
+            path = self._sysctl_path(key)
+            value = self._read_value(path)
+            if value is None or not value.isdigit():
+                continue
+            bytes_key = DIRTY_LIMIT_PAIRS.get(key)
+            if bytes_key and self._read_value(self._sysctl_path(bytes_key)) not in (None, "0"):
+                continue  # The host uses a byte limit, which writing the ratio would clear
+            paths[key] = path
+        if not paths:
+            return "No tunables available for auto-tuning"
+
+        snapshot = self._load_snapshot()
+        self._snapshot_values(snapshot, paths.values())
+        self._save_snapshot(snapshot)
+
+        keys = list(paths)
+        directions = {key: 1 for key in keys}
+        history = []
+        best = self.objective(sampler(interval))
+
+        for i in range(iterations):
+            key = keys[i % len(keys)]
+            bounds = AUTO_TUNABLES[key]
+            current = int(self._read_value(paths[key]))
+
+            candidate = min(max(current + directions[key] * bounds["step"], bounds["min"]), bounds["max"])
+            if candidate == current:
+                directions[key] = -directions[key]
+                candidate = min(max(current + directions[key] * bounds["step"], bounds["min"]), bounds["max"])
+                if candidate == current:
+                    continue
+
+            if self._write_values({paths[key]: candidate}):
+                history.append({"tunable": key, "from": current, "to": candidate, "result": "failed"})
+                continue
+
+            score = self.objective(sampler(interval))
+            if score < best * (1 - tolerance):
+                best = score
+                outcome = "kept"
+            else:
+                self._write_values({paths[key]: current})
+                directions[key] = -directions[key]
+                outcome = "reverted"
+                # Re-measure at the known-good setting so a changing workload doesn't leave a stale baseline
+                best = self.objective(sampler(interval))
+
+            history.append({"tunable": key, "from": current, "to": candidate,
+                            "objective": score, "result": outcome})
+
+        self._save_history(history)
+
+        kept = sum(1 for step in history if step["result"] == "kept")
+        reverted = sum(1 for step in history if step["result"] == "reverted")
+        result = f"Auto-tuning finished: {kept} changes kept, {reverted} reverted"
+        for key, path in paths.items():
+            result += f"\n{key} = {self._read_value(path)}"
+        return result
+
+    @tracer.traced("metrics")
+    def _read_counters(self):
+        """Read the raw counters behind sample_metrics from /proc"""
+        counters = {"cpu_total": 0, "cpu_iowait": 0, "procs_running": 0,
+                    "major_faults": 0, "memory_stall_us": 0}
+
+        stat = self._read_raw(os.path.join(self.proc_root, "stat")) or ""
+        for line in stat.split("\n"):
+            fields = line.split()
+            if fields and fields[0] == "cpu":
+                values = [int(v) for v in fields[1:]]
+                # guest time is already included in user and nice
+                counters["cpu_total"] = sum(values[:8])
+                counters["cpu_iowait"] = values[4] if len(values) > 4 else 0
+            elif fields and fields[0] == "procs_running":
+                counters["procs_running"] = int(fields[1])
+
+        vmstat = self._read_raw(os.path.join(self.proc_root, "vmstat")) or ""
+        for line in vmstat.split("\n"):
+            fields = line.split()
+            if fields and fields[0] == "pgmajfault":
+                counters["major_faults"] = int(fields[1])
+
+        pressure = self._read_raw(os.path.join(self.proc_root, "pressure", "memory")) or ""
+        for line in pressure.split("\n"):
+            if line.startswith("some"):
+                for field in line.split()[1:]:
+                    name, _, value = field.partition("=")
+                    if name == "total":
+                        counters["memory_stall_us"] = int(value)
+
+        return counters
+
+    def _resolve_profile(self, profile):
+        """Expand a profile into {absolute path: value} and a list of unsupported paths"""
+        settings = {}
+        skipped = []
+
+        for key, value in PROFILES[profile]["sysctl"].items():
+            path = self._sysctl_path(key)
+            if os.path.exists(path):
+                settings[path] = value
+            else:
+                skipped.append(path)
+
+        for pattern, value in PROFILES[profile]["sysfs"].items():
+            paths = sorted(glob.glob(os.path.join(self.sysfs_root, pattern)))
+            if not paths:
+                skipped.append(os.path.join(self.sysfs_root, pattern))
+            for path in paths:
+                options = self._read_options(path)
+                if options and value not in options:
+                    skipped.append(path)
+                else:
+                    settings[path] = value
+
+        return settings, skipped
+
+    def _sysctl_path(self, key):
+        return os.path.join(self.proc_root, "sys", *key.split("."))
+
+    def _snapshot_values(self, snapshot, paths):
+        """Save the current value of paths not yet in the snapshot, with their paired dirty limits"""
+        paths = list(paths)
+        for ratio_key, bytes_key in DIRTY_LIMIT_PAIRS.items():
+            if self._sysctl_path(ratio_key) in paths and os.path.exists(self._sysctl_path(bytes_key)):
+                paths.append(self._sysctl_path(bytes_key))
+
+        for path in paths:
+            if path not in snapshot["values"]:
+                snapshot["values"][path] = self._read_value(path)
+
+    @tracer.traced("file")
+    def _read_raw(self, path):
+        try:
+            with open(path, 'r') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _read_options(self, path):
+        """
+        Return the choices offered by a selector file like 'none [mq-deadline] bfq'
+
+        cpufreq governors only show the current one, so they are listed from the
+        sibling scaling_available_governors file instead.
+        """
+        if os.path.basename(path) == "scaling_governor":
+            raw = self._read_raw(os.path.join(os.path.dirname(path), "scaling_available_governors"))
+            return raw.split() if raw else []
+        raw = self._read_raw(path)
+        if raw is None or "[" not in raw:
+            return []
+        return [option.strip("[]") for option in raw.split()]
+
+    def _read_value(self, path):
+        """Read a setting, returning the selected choice for selector files"""
+        raw = self._read_raw(path)
+        if raw is None:
+            return None
+        if "[" in raw:
+            for option in raw.split():
+                if option.startswith("["):
+                    return option.strip("[]")
+        return " ".join(raw.split())
+
+    @tracer.traced("file")
+    def _write_values(self, values):
+        """Write every value directly to its file and return {path: error} for failures"""
+        failed = {}
+        for path, value in values.items():
+            try:
+                with open(path, 'w') as f:
+                    f.write(str(value))
+            except OSError as e:
+                failed[path] = e.strerror or str(e)
+        return failed
+
+    def _verify_values(self, values):
+        """Return the paths whose current value differs from the expected one"""
+        return [path for path, value in values.items()
+                if self._read_value(path) != " ".join(str(value).split())]
+
+    @tracer.traced("file")
+    def _load_snapshot(self):
+        """Load saved original values from file"""
+        try:
+            with open(self.snapshot_file, 'r') as f:
+                return json.load(f)
+        except:
+            return {"profile": None, "values": {}}
+
+    @tracer.traced("file")
+    def _save_snapshot(self, snapshot):
+        """Save original values to file"""
+        with open(self.snapshot_file, 'w') as f:
+            json.dump(snapshot, f, indent=2)
+
+    @tracer.traced("file")
+    def _save_history(self, history):
+        """Save the steps of the last auto-tuning session to file"""
+        with open(os.path.join(self.state_dir, "autotune.json"), 'w') as f:
+            json.dump({"finished": time.strftime("%Y-%m-%d %H:%M:%S"), "steps": history}, f, indent=2)
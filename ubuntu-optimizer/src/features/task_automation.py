@@ -1,9 +1,12 @@
 import os
+import sys
 import json
+import shlex
 import time
 import threading
 import schedule
 import psutil
+from .instrumentation import tracer
 
 class TaskAutomation:
     def __init__(self):
@@ -102,6 +105,7 @@ class TaskAutomation:
                 del self.running_tasks[name]
             return f"Task '{name}' disabled"
     
+    @tracer.traced("file")
     def _load_tasks(self):
         """Load tasks from file"""
         try:
@@ -110,6 +114,7 @@ class TaskAutomation:
         except:
             return {}
             
+    @tracer.traced("file")
     def _save_tasks(self, tasks):
         """Save tasks to file"""
         with open(self.tasks_file, 'w') as f:
@@ -197,13 +202,16 @@ class TaskAutomation:
             thread.start()
 
     def create_cpu_optimization_task(self, threshold=80, name="auto_cpu_optimizer"):
-        """Create a task that automatically optimizes when CPU usage is too high"""
-        condition = f"psutil.cpu_percent() > {threshold}"
-        command = "killall -STOP $(ps aux | sort -nrk 3,3 | grep -v PID | head -n 5 | awk '{print $2}')"
+        """
+        Create a task that throttles the heaviest processes while CPU usage is too high
+        
+        The task runs unconditionally so throttled processes are released once usage drops.
+        """
+        main_script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+        command = f"{shlex.quote(sys.executable)} {shlex.quote(main_script)} throttle_cpu {int(threshold)}"
         
         return self.create_task(
             name=name,
             command=command,
-            schedule_time="every 5 minutes",
-            condition=condition
+            schedule_time="every 5 minutes"
         )
\ No newline at end of file
@@ -1,33 +1,61 @@
 # This file serves as the entry point for the application. It initializes the application and handles command-line arguments.
 
+import os
 import sys
+import json
 from features.memory_optimization import MemoryOptimizer
 from features.disk_cleanup import DiskCleaner
 from features.startup_manager import StartupManager
-from features.system_tweaks import SystemTweaks
+from features.system_tweaks import SystemTweaks, PROFILES
 from features.custom_shortcuts import ShortcutManager
 from features.task_automation import TaskAutomation
 from features.service_optimizer import ServiceOptimizer
+from features.benchmark import OptimizationBenchmark
+from features.process_throttler import ProcessThrottler
+from features.fleet import FleetRunner
+from features.instrumentation import run_profiled, check_profile_mode
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <command> [arguments]")
+    # --profile[=summary|cprofile[:path]|chrome[:path]] may appear anywhere
+    for arg in sys.argv[1:]:
+        if arg == "--profile" or arg.startswith("--profile="):
+            sys.argv.remove(arg)
+            mode = arg.partition("=")[2] or "summary"
+            try:
+                check_profile_mode(mode)
+            except ValueError as e:
+                print(str(e))
+                return 1
+            status = []
+            print(run_profiled(lambda: status.append(main()), mode), file=sys.stderr)
+            return status[0] if status else 1
+
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
+        print("Usage: python main.py <command> [arguments] [--profile[=summary|cprofile[:path]|chrome[:path]]]")
         print("\nAvailable commands:")
         print("  optimize_memory               - Optimize memory usage")
         print("  clean_disk                    - Clean up disk space")
         print("  manage_startup                - Manage startup applications")
-        print("  apply_tweaks                  - Apply system tweaks")
+        print("  apply_tweaks [profile]        - Apply a performance profile")
+        print("  reset_tweaks                  - Restore settings changed by profiles")
+        print("  list_profiles                 - List performance profiles")
+        print("  auto_tune [iterations] [secs] - Adapt kernel tunables to the current workload")
+        print("  metrics [secs]                - Print memory pressure, I/O wait, run queue and page faults as JSON")
         print("  create_shortcut <name> <cmd> <keys> - Create keyboard shortcut")
         print("  list_shortcuts                - List all keyboard shortcuts")
         print("  remove_shortcut <name>        - Remove keyboard shortcut")
         print("  create_task <name> <cmd> <schedule> - Create automated task")
         print("  list_tasks                    - List all automated tasks")
         print("  remove_task <name>            - Remove automated task")
+        print("  throttle_cpu [threshold]      - Throttle top CPU users above threshold, release below it")
+        print("  release_throttled             - Release all throttled processes")
         print("  list_services                 - List all system services")
         print("  optimize_service <name>       - Optimize specific service")
         print("  auto_optimize_services        - Optimize all monitored services")
         print("  disable_service <name>        - Add service to disable list")
-        return
+        print("  benchmark <action> [target]   - Measure an action (service, memory, tweaks, disk)")
+        print("  fleet <inventory> <command> [args] [--then <command> [args]] - Run commands on every host of an inventory")
+        return 0 if len(sys.argv) > 1 else 1
 
     command = sys.argv[1]
 
@@ -42,12 +70,32 @@ def main():
         manager.manage_startup_apps()
     elif command == "apply_tweaks":
         tweaks = SystemTweaks()
-        tweaks.apply_tweaks()
+        profile = sys.argv[2] if len(sys.argv) > 2 else None
+        print(tweaks.apply_tweaks(profile))
+        if profile not in PROFILES or tweaks.verify_tweaks(profile):
+            return 1
+    elif command == "reset_tweaks":
+        tweaks = SystemTweaks()
+        print(tweaks.reset_tweaks())
+        if os.path.exists(tweaks.snapshot_file):
+            return 1
+    elif command == "list_profiles":
+        tweaks = SystemTweaks()
+        print(tweaks.list_profiles())
+    elif command == "auto_tune":
+        tweaks = SystemTweaks()
+        iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+        interval = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+        print(tweaks.auto_tune(iterations=iterations, interval=interval))
+    elif command == "metrics":
+        tweaks = SystemTweaks()
+        interval = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+        print(json.dumps(tweaks.sample_metrics(interval=interval)))
     # Keyboard Shortcuts commands
     elif command == "create_shortcut":
         if len(sys.argv) < 5:
             print("Usage: python main.py create_shortcut <name> <command> <key_combo>")
-            return
+            return 1
         shortcut_mgr = ShortcutManager()
         result = shortcut_mgr.create_shortcut(sys.argv[2], sys.argv[3], sys.argv[4])
         print(result)
@@ -57,7 +105,7 @@ def main():
     elif command == "remove_shortcut":
         if len(sys.argv) < 3:
             print("Usage: python main.py remove_shortcut <name>")
-            return
+            return 1
         shortcut_mgr = ShortcutManager()
         result = shortcut_mgr.remove_shortcut(sys.argv[2])
         print(result)
@@ -65,7 +113,7 @@ def main():
     elif command == "create_task":
         if len(sys.argv) < 5:
             print("Usage: python main.py create_task <name> <command> <schedule>")
-            return
+            return 1
         task_auto = TaskAutomation()
         result = task_auto.create_task(sys.argv[2], sys.argv[3], sys.argv[4])
         print(result)
@@ -75,10 +123,18 @@ def main():
     elif command == "remove_task":
         if len(sys.argv) < 3:
             print("Usage: python main.py remove_task <name>")
-            return
+            return 1
         task_auto = TaskAutomation()
         result = task_auto.remove_task(sys.argv[2])
         print(result)
+    # Process throttling commands
+    elif command == "throttle_cpu":
+        throttler = ProcessThrottler()
+        threshold = float(sys.argv[2]) if len(sys.argv) > 2 else 80
+        print(throttler.run_once(threshold))
+    elif command == "release_throttled":
+        throttler = ProcessThrottler()
+        print(throttler.restore())
     # Service Optimizer commands
     elif command == "list_services":
         service_opt = ServiceOptimizer()
@@ -86,7 +142,7 @@ def main():
     elif command == "optimize_service":
         if len(sys.argv) < 3:
             print("Usage: python main.py optimize_service <service_name>")
-            return
+            return 1
         service_opt = ServiceOptimizer()
         result = service_opt.optimize_service(sys.argv[2])
         print(result)
@@ -97,12 +153,53 @@ def main():
     elif command == "disable_service":
         if len(sys.argv) < 3:
             print("Usage: python main.py disable_service <service_name>")
-            return
+            return 1
         service_opt = ServiceOptimizer()
         result = service_opt.add_service_to_disable(sys.argv[2])
         print(result)
+    # Benchmark commands
+    elif command == "benchmark":
+        if len(sys.argv) < 3:
+            print("Usage: python main.py benchmark <service|memory|tweaks|disk> [target]")
+            return 1
+        bench = OptimizationBenchmark()
+        try:
+            report = bench.benchmark_named_action(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+        except ValueError as e:
+            print(str(e))
+            print("Usage: python main.py benchmark <service|memory|tweaks|disk> [target]")
+            return 1
+        print(json.dumps(report, indent=2))
+        print(f"Report saved to {bench.save_report(report)}")
+        if report["action_error"]:
+            return 1
+    # Fleet commands
+    elif command == "fleet":
+        if len(sys.argv) < 4:
+            print("Usage: python main.py fleet <inventory.json> <command> [arguments] [--then <command> [arguments]]")
+            return 1
+        commands = [[]]
+        for arg in sys.argv[3:]:
+            if arg == "--then":
+                commands.append([])
+            else:
+                commands[-1].append(arg)
+        try:
+            fleet = FleetRunner(sys.argv[2])
+        except (OSError, ValueError) as e:
+            print(f"Cannot load inventory {sys.argv[2]}: {e}")
+            print("Usage: python main.py fleet <inventory.json> <command> [arguments] [--then <command> [arguments]]")
+            return 1
+        # Connections stay open until ControlPersist expires so the next invocation reuses them
+        results = [result for host_results in fleet.run_sequence(commands) for result in host_results]
+        print(fleet.summarize(results))
+        print(f"Results saved to {fleet.save_results(results)}")
+        if not all(result["ok"] for result in results):
+            return 1
     else:
         print(f"Unknown command: {command}")
+        return 1
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,121 @@
+import json
+import random
+import tempfile
+import unittest
+from unittest import mock
+from src.features import benchmark
+from src.features.benchmark import OptimizationBenchmark, summarize, compare, welch_p_value
+
+class TestOptimizationBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self.results_dir = tempfile.mkdtemp()
+        self.benchmark = OptimizationBenchmark(
+            workloads={"cpu": {"rounds": 2}, "memory": {"size_mb": 1},
+                       "file_io": {"size_mb": 1}, "process_spawn": {"count": 1}},
+            repeats=3,
+            blocks=2,
+            warmup=0,
+            results_dir=self.results_dir
+        )
+
+    def test_run_workloads(self):
+        result = self.benchmark.run_workloads()
+        self.assertEqual(set(result), {"cpu", "memory", "file_io", "process_spawn"})
+        for samples in result.values():
+            self.assertEqual(len(samples), 3)
+
+    def test_summarize_confidence_interval(self):
+        stats = summarize([1.0, 2.0, 3.0])
+        self.assertAlmostEqual(stats["mean"], 2.0)
+        # t(2) = 4.303, stdev = 1, n = 3
+        self.assertAlmostEqual(stats["ci95_high"] - stats["mean"], 4.303 / 3 ** 0.5, places=3)
+
+    def test_compare_verdicts(self):
+        slow = summarize([2.0, 2.1, 1.9])
+        fast = summarize([1.0, 1.1, 0.9])
+        self.assertEqual(compare(slow, fast)["verdict"], "improved")
+        self.assertEqual(compare(fast, slow)["verdict"], "regressed")
+        self.assertEqual(compare(slow, slow)["verdict"], "inconclusive")
+
+    def test_welch_p_value(self):
+        # t = 2.228 with 10 degrees of freedom is the two-sided 5% critical value
+        self.assertAlmostEqual(benchmark._regularized_beta(5, 0.5, 10 / (10 + 2.228 ** 2)), 0.05, places=3)
+        self.assertLess(welch_p_value([2.0, 2.1, 1.9], [1.0, 1.1, 0.9]), 0.001)
+        self.assertEqual(welch_p_value([1.0, 1.0], [1.0, 1.0]), 1.0)
+
+    def test_small_changes_are_inconclusive(self):
+        before = summarize([1.00, 1.01, 0.99, 1.00])
+        after = summarize([0.97, 0.98, 0.96, 0.97])
+        # Significant, but smaller than the minimum effect
+        self.assertEqual(compare(before, after)["verdict"], "inconclusive")
+        self.assertEqual(compare(before, after, min_effect=1.0)["verdict"], "improved")
+
+    def _simulated_benchmark(self, speedup_after_action):
+        """
+        Benchmark with a fake clock, optionally faster after the action
+
+        Timings are noisy and the machine speed also steps by up to 15% between
+        blocks, like a host whose load changes while the benchmark runs.
+        """
+        clock = [0.0]
+        noise = random.Random(7)
+        state = {"factor": 1.0, "speed": 1.0, "calls": 0}
+
+        def workload():
+            if state["calls"] % 12 == 0:
+                state["speed"] = noise.uniform(0.85, 1.15)
+            state["calls"] += 1
+            clock[0] += noise.gauss(1.0, 0.05) * state["speed"] * state["factor"]
+
+        def action():
+            state["factor"] = speedup_after_action
+
+        workloads = {name: {} for name in ("a", "b", "c", "d")}
+        with mock.patch.dict(benchmark.WORKLOAD_FUNCTIONS, {name: workload for name in workloads}), \
+                mock.patch.object(benchmark.time, "perf_counter", lambda: clock[0]):
+            bench = OptimizationBenchmark(workloads=workloads, repeats=3, blocks=6, warmup=0,
+                                          results_dir=self.results_dir)
+            return bench.benchmark_action("simulated", action)
+
+    def test_noop_action_is_inconclusive(self):
+        report = self._simulated_benchmark(1.0)
+        self.assertEqual(report["verdict"], "inconclusive")
+        self.assertEqual({result["verdict"] for result in report["workloads"].values()}, {"inconclusive"})
+
+    def test_real_improvement_is_detected(self):
+        report = self._simulated_benchmark(0.5)
+        self.assertEqual(report["verdict"], "improved")
+
+    def test_benchmark_action_report(self):
+        calls = []
+        report = self.benchmark.benchmark_action("noop", lambda: calls.append(1) or "done")
+        self.assertEqual(calls, [1])
+        self.assertEqual(report["action_result"], "done")
+        self.assertIn(report["verdict"], ("improved", "regressed", "inconclusive"))
+
+        path = self.benchmark.save_report(report)
+        with open(path) as f:
+            self.assertEqual(json.load(f)["workloads"].keys(), report["workloads"].keys())
+
+    def test_action_error_is_reported(self):
+        def failing():
+            raise RuntimeError("boom")
+        report = self.benchmark.benchmark_action("failing", failing)
+        self.assertEqual(report["action_error"], "boom")
+
+    def test_single_sample_is_inconclusive(self):
+        self.assertEqual(compare(summarize([2.0]), summarize([1.0]))["verdict"], "inconclusive")
+        with self.assertRaises(ValueError):
+            OptimizationBenchmark(blocks=1, results_dir=self.results_dir)
+
+    def test_unknown_action(self):
+        with self.assertRaises(ValueError):
+            self.benchmark.benchmark_named_action("reboot")
+        with self.assertRaises(ValueError):
+            self.benchmark.benchmark_named_action("tweaks")
+        with self.assertRaises(ValueError):
+            self.benchmark.benchmark_named_action("tweaks", "gaming")
+
+if __name__ == '__main__':
+    unittest.main()
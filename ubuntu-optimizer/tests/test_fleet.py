@@ -0,0 +1,165 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from src.features.fleet import FleetRunner, LocalExecutor, SSHExecutor
+
+class RecordingExecutor:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.closed = []
+
+    def run(self, host, argv, timeout=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if host["name"] == "bad":
+            return 255, "", "ssh: connect to host bad port 22: Connection refused\n"
+        return 0, f"{host['address']}: {' '.join(argv[2:])}\n", ""
+
+    def close(self, host):
+        self.closed.append(host["name"])
+
+# Stands in for ssh: emulates a ControlMaster socket per target and runs the remote command locally
+SSH_STUB = """#!{python}
+import os, sys, subprocess
+args, options, rest = sys.argv[1:], {{}}, []
+while args:
+    arg = args.pop(0)
+    if arg == "-o":
+        key, _, value = args.pop(0).partition("=")
+        options[key] = value
+    elif arg in ("-p", "-O"):
+        options[arg] = args.pop(0)
+    else:
+        rest.append(arg)
+socket = options["ControlPath"].replace("%C", rest[0])
+if options.get("-O") == "exit":
+    os.path.exists(socket) and os.remove(socket)
+    sys.exit(0)
+with open(os.environ["SSH_STUB_LOG"], "a") as log:
+    log.write(("reuse " if os.path.exists(socket) else "connect ") + rest[0] + "\\n")
+open(socket, "w").close()
+sys.exit(subprocess.call(rest[1], shell=True))
+"""
+
+class TestFleetRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.results_dir = tempfile.mkdtemp()
+        self.inventory = {
+            "remote_command": "python3 /opt/uo/main.py",
+            "hosts": ["web1", "ops@web2", {"name": "db1", "address": "10.0.0.5", "port": 2222}, "bad"]
+        }
+
+    def test_run_collects_results_in_order(self):
+        executor = RecordingExecutor()
+        fleet = FleetRunner(self.inventory, executor=executor, results_dir=self.results_dir)
+        results = fleet.run("clean_disk")
+        self.assertEqual([result["host"] for result in results], ["web1", "ops@web2", "db1", "bad"])
+        self.assertEqual(results[2]["stdout"], "10.0.0.5: clean_disk\n")
+        self.assertEqual(results[0]["command"], ["python3", "/opt/uo/main.py", "clean_disk"])
+        self.assertFalse(results[3]["ok"])
+
+        summary = fleet.summarize(results)
+        self.assertIn("Connection refused", summary)
+        self.assertIn("4 hosts: 3 ok, 1 failed", summary)
+
+        fleet.close()
+        self.assertEqual(executor.closed, ["web1", "ops@web2", "db1", "bad"])
+
+    def test_parallelism_is_bounded(self):
+        executor = RecordingExecutor()
+        self.inventory["hosts"] = [f"host{i}" for i in range(8)]
+        fleet = FleetRunner(self.inventory, executor=executor, max_parallel=3, results_dir=self.results_dir)
+        fleet.run("list_tasks")
+        self.assertEqual(executor.peak, 3)
+
+    def test_local_executor(self):
+        self.inventory["remote_command"] = [sys.executable, "-c", "import sys; print(sys.argv[1:])"]
+        fleet = FleetRunner(self.inventory, executor=LocalExecutor(), results_dir=self.results_dir)
+        results = fleet.run("optimize_service", "cups")
+        self.assertTrue(all(result["ok"] for result in results))
+        self.assertEqual(results[0]["stdout"].strip(), "['optimize_service', 'cups']")
+
+    def test_command_failure_marks_host_failed(self):
+        # Stands in for main.py rejecting a command: the connection works but the command fails
+        self.inventory["remote_command"] = [sys.executable, "-c",
+                                            "import sys; print('Unknown command: ' + sys.argv[1]); sys.exit(1)"]
+        fleet = FleetRunner(self.inventory, executor=LocalExecutor(), results_dir=self.results_dir)
+        results = fleet.run("optimise_memory")
+        self.assertEqual([result["returncode"] for result in results], [1, 1, 1, 1])
+        self.assertFalse(any(result["ok"] for result in results))
+        self.assertIn("4 hosts: 0 ok, 4 failed", fleet.summarize(results))
+
+    def test_json_output_is_parsed(self):
+        self.inventory["remote_command"] = [sys.executable, "-c",
+                                            "import json; print(json.dumps({'iowait': 1.5})); print('Saved')"]
+        fleet = FleetRunner(self.inventory, executor=LocalExecutor(), results_dir=self.results_dir)
+        self.assertEqual(fleet.run("metrics")[0]["data"], {"iowait": 1.5})
+
+        self.inventory["remote_command"] = [sys.executable, "-c", "print('3 tasks')"]
+        fleet = FleetRunner(self.inventory, executor=LocalExecutor(), results_dir=self.results_dir)
+        self.assertIsNone(fleet.run("list_tasks")[0]["data"])
+
+    def test_invalid_inventory(self):
+        path = os.path.join(self.results_dir, "inventory.json")
+        with open(path, 'w') as f:
+            f.write('{"hosts": [')
+        with self.assertRaises(ValueError):
+            FleetRunner(path, results_dir=self.results_dir)
+        with self.assertRaises(ValueError):
+            FleetRunner({"hosts": []}, results_dir=self.results_dir)
+        with self.assertRaises(OSError):
+            FleetRunner(os.path.join(self.results_dir, "missing.json"), results_dir=self.results_dir)
+
+    def test_ssh_arguments_reuse_connections(self):
+        executor = SSHExecutor(control_dir=self.results_dir)
+        host = FleetRunner(self.inventory, executor=executor, results_dir=self.results_dir).hosts[2]
+        args = executor._ssh_args(host)
+        self.assertIn("ControlMaster=auto", args)
+        self.assertEqual(args[-2:], ["-p", "2222"])
+        self.assertEqual(executor._target(host), "10.0.0.5")
+
+    def test_ssh_connections_are_reused(self):
+        bin_dir = tempfile.mkdtemp()
+        with open(os.path.join(bin_dir, "ssh"), 'w') as f:
+            f.write(SSH_STUB.format(python=sys.executable))
+        os.chmod(os.path.join(bin_dir, "ssh"), 0o755)
+        log = os.path.join(bin_dir, "log")
+        environment = {"PATH": bin_dir + os.pathsep + os.environ["PATH"], "SSH_STUB_LOG": log}
+
+        self.inventory = {"remote_command": ["echo"], "hosts": ["web1", "web2"]}
+        executor = SSHExecutor(control_dir=self.results_dir)
+        fleet = FleetRunner(self.inventory, executor=executor, results_dir=self.results_dir)
+        with mock.patch.dict(os.environ, environment):
+            results = fleet.run_sequence([["list_tasks"], ["clean_disk"]])
+            fleet.run("list_services")
+            fleet.close()
+            fleet.run("list_services")
+
+        self.assertEqual([result["stdout"] for result in results[0]], ["list_tasks\n", "clean_disk\n"])
+        with open(log) as f:
+            entries = sorted(f.read().split("\n")[:-1])
+        self.assertEqual(entries, ["connect web1", "connect web1", "connect web2", "connect web2",
+                                   "reuse web1", "reuse web1", "reuse web2", "reuse web2"])
+
+    def test_sequence_stops_at_first_failure(self):
+        fleet = FleetRunner(self.inventory, executor=RecordingExecutor(delay=0), results_dir=self.results_dir)
+        results = fleet.run_sequence([["list_tasks"], ["clean_disk"]])
+        self.assertEqual(len(results[0]), 2)
+        self.assertEqual(len(results[3]), 1)
+        summary = fleet.summarize([result for host_results in results for result in host_results])
+        self.assertIn("4 hosts: 3 ok, 1 failed", summary)
+
+if __name__ == '__main__':
+    unittest.main()
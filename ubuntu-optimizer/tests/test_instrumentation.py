@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import tempfile
+import pathlib
+import unittest
+import importlib.util
+import subprocess
+from unittest import mock
+from src.features.instrumentation import tracer, run_profiled
+from src.features.system_tweaks import SystemTweaks
+from src.features.process_throttler import ProcessThrottler
+from src.features.benchmark import OptimizationBenchmark
+from src.features.fleet import FleetRunner
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        tracer.stop()
+
+    def test_spans_only_recorded_when_enabled(self):
+        tracer.start()
+        with tracer.span("load", "file"):
+            pass
+        tracer.stop()
+        with tracer.span("ignored"):
+            pass
+        self.assertEqual([(span["category"], span["name"]) for span in tracer.spans], [("file", "load")])
+
+    def test_subprocesses_are_counted(self):
+        original_popen = subprocess.Popen
+        tracer.start()
+        subprocess.run([sys.executable, "-c", "pass"])
+        subprocess.check_output(["true"])
+        os.system("true")
+        tracer.stop()
+
+        self.assertEqual(tracer.counters["subprocess"], 3)
+        self.assertEqual(sum(1 for span in tracer.spans if span["category"] == "subprocess"), 3)
+        self.assertIs(subprocess.Popen, original_popen)
+
+    def test_tracing_accepts_path_like_commands(self):
+        tracer.start()
+        completed = subprocess.run(pathlib.Path("/bin/true"))
+        tracer.stop()
+        self.assertEqual(completed.returncode, 0)
+        self.assertEqual([span["name"] for span in tracer.spans if span["category"] == "subprocess"], ["true"])
+
+    def test_command_errors_propagate(self):
+        def failing():
+            raise ValueError("bad argument")
+        with self.assertRaises(ValueError):
+            run_profiled(failing, "chrome:" + os.path.join(self.root, "trace.json"))
+        self.assertFalse(tracer.enabled)
+
+    def test_saved_results_are_traced(self):
+        bench = OptimizationBenchmark(workloads={"cpu": {"rounds": 1}}, results_dir=self.root)
+        fleet = FleetRunner({"hosts": ["web1"]}, executor=object(), results_dir=self.root)
+        tracer.start()
+        bench.save_report({"action": "noop"})
+        fleet.save_results([])
+        tracer.stop()
+        self.assertEqual([(span["category"], span["name"]) for span in tracer.spans],
+                         [("file", "save_report"), ("file", "save_results")])
+
+    def test_chrome_trace(self):
+        path = os.path.join(self.root, "trace.json")
+        report = run_profiled(lambda: subprocess.run(["true"]), "chrome:" + path)
+        self.assertIn("command total", report)
+        with open(path) as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual({event["name"] for event in events}, {"total", "true"})
+        self.assertTrue(all(event["ph"] == "X" for event in events))
+
+    def test_cprofile_dump(self):
+        path = os.path.join(self.root, "out.prof")
+        run_profiled(lambda: None, "cprofile:" + path)
+        self.assertTrue(os.path.exists(path))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            run_profiled(lambda: None, "flamegraph")
+
+    def test_apply_tweaks_spawns_no_processes(self):
+        os.makedirs(os.path.join(self.root, "proc", "sys", "vm"))
+        with open(os.path.join(self.root, "proc", "sys", "vm", "swappiness"), 'w') as f:
+            f.write("60\n")
+        tweaks = SystemTweaks(proc_root=os.path.join(self.root, "proc"),
+                              sysfs_root=os.path.join(self.root, "sys"),
+                              state_dir=os.path.join(self.root, "state"))
+
+        run_profiled(lambda: tweaks.apply_tweaks("throughput_server"))
+        self.assertEqual(tracer.counters.get("subprocess", 0), 0)
+        self.assertIn("_write_values", {span["name"] for span in tracer.spans})
+
+    def test_throttle_spawns_no_processes(self):
+        throttler = ProcessThrottler(cgroup_root=os.path.join(self.root, "cgroup"),
+                                     proc_root=os.path.join(self.root, "proc"),
+                                     state_dir=os.path.join(self.root, "state"))
+        processes = [{"pid": 4242, "name": "ffmpeg", "ppid": 1, "cpu": 99.0}]
+
+        run_profiled(lambda: throttler.throttle(processes))
+        self.assertEqual(tracer.counters.get("subprocess", 0), 0)
+
+@unittest.skipUnless(importlib.util.find_spec("psutil"), "psutil is not installed")
+class TestServiceOptimizerForks(unittest.TestCase):
+    """Catch regressions in the number of processes spawned per service command"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        bin_dir = os.path.join(self.root, "bin")
+        os.makedirs(bin_dir)
+        stubs = {
+            # Report this test process as the service's main process
+            "systemctl": f'[ "$1" = status ] && echo "   Main PID: {os.getpid()} (demo)"\nexit 0',
+            "pgrep": "exit 1",
+            "renice": "exit 0"
+        }
+        for name, body in stubs.items():
+            path = os.path.join(bin_dir, name)
+            with open(path, 'w') as f:
+                f.write("#!/bin/sh\n" + body + "\n")
+            os.chmod(path, 0o755)
+
+        self.environment = mock.patch.dict(os.environ, {
+            "PATH": bin_dir + os.pathsep + os.environ["PATH"],
+            "HOME": self.root
+        })
+        self.environment.start()
+        from src.features.service_optimizer import ServiceOptimizer
+        self.service_optimizer = ServiceOptimizer()
+
+    def tearDown(self):
+        self.environment.stop()
+        tracer.stop()
+
+    def test_optimize_service_fork_count(self):
+        run_profiled(lambda: self.service_optimizer.optimize_service("demo"))
+        # status check, 3 x (status + pgrep) for the pids, renice, restart
+        self.assertEqual(tracer.counters["subprocess"], 9)
+
+    def test_auto_optimize_services_fork_count(self):
+        self.service_optimizer.optimize_service("demo")
+        self.service_optimizer.optimize_service("other")
+
+        run_profiled(self.service_optimizer.auto_optimize_services)
+        self.assertEqual(tracer.counters["subprocess"], 18)
+
+if __name__ == '__main__':
+    unittest.main()
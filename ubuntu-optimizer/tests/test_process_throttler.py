@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+from src.features.process_throttler import ProcessThrottler
+
+class TestProcessThrottler(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cgroup_root = os.path.join(self.root, "cgroup")
+        self.proc_root = os.path.join(self.root, "proc")
+        os.makedirs(os.path.join(self.cgroup_root, "user.slice"))
+        self.processes = [
+            {"pid": 100, "name": "gnome-shell", "ppid": 1, "cpu": 95.0},
+            {"pid": 200, "name": "ffmpeg", "ppid": 1, "cpu": 90.0},
+            {"pid": 300, "name": "make", "ppid": 1, "cpu": 40.0},
+            {"pid": 400, "name": "bash", "ppid": 1, "cpu": 1.0},
+            {"pid": 500, "name": "kworker/0:1", "ppid": 2, "cpu": 80.0}
+        ]
+        for process in self.processes:
+            path = os.path.join(self.proc_root, str(process["pid"]))
+            os.makedirs(path)
+            with open(os.path.join(path, "cgroup"), 'w') as f:
+                f.write("0::/user.slice/session-3.scope\n")
+            self._write_stat(process["pid"], process["name"], 5000)
+        os.makedirs(os.path.join(self.cgroup_root, "user.slice", "session-3.scope"))
+        self.throttler = ProcessThrottler(cgroup_root=self.cgroup_root, proc_root=self.proc_root,
+                                          state_dir=os.path.join(self.root, "state"))
+
+    def _write_stat(self, pid, name, start_time):
+        fields = ["R", "1"] + ["0"] * 17 + [str(start_time)] + ["0"] * 10
+        with open(os.path.join(self.proc_root, str(pid), "stat"), 'w') as f:
+            f.write(f"{pid} ({name}) {' '.join(fields)}\n")
+
+    def _read(self, *parts):
+        with open(os.path.join(*parts)) as f:
+            return f.read().strip()
+
+    def test_select_victims(self):
+        victims = self.throttler.select_victims(self.processes)
+        self.assertEqual([victim["pid"] for victim in victims], [200, 300])
+
+    def test_denylist_limits_victims(self):
+        throttler = ProcessThrottler(cgroup_root=self.cgroup_root, proc_root=self.proc_root,
+                                     denylist=["make"], state_dir=os.path.join(self.root, "state"))
+        victims = throttler.select_victims(self.processes)
+        self.assertEqual([victim["pid"] for victim in victims], [300])
+
+    def test_throttle_and_restore(self):
+        result = self.throttler.throttle(self.processes)
+        self.assertIn("Throttled ffmpeg (200)", result)
+        self.assertEqual(self._read(self.throttler.group_path, "cpu.max"), "20000 100000")
+        # Already throttled processes aren't selected again
+        self.assertEqual(self.throttler.select_victims(self.processes), [])
+
+        result = self.throttler.restore()
+        self.assertIn("Restored make (300)", result)
+        self.assertEqual(self._read(self.cgroup_root, "user.slice", "session-3.scope", "cgroup.procs"), "300")
+        self.assertEqual(self.throttler.restore(), "No throttled processes")
+
+    def test_restore_falls_back_to_parent_cgroup(self):
+        self.throttler.throttle(self.processes)
+        os.rmdir(os.path.join(self.cgroup_root, "user.slice", "session-3.scope"))
+        result = self.throttler.restore()
+        self.assertIn("Restored make (300) to /user.slice", result)
+        self.assertEqual(self.throttler._load_state(), {})
+
+    def test_failed_restore_is_kept(self):
+        self.throttler.throttle(self.processes)
+        os.rmdir(os.path.join(self.cgroup_root, "user.slice", "session-3.scope"))
+        # Directories in place of cgroup.procs make every write fail
+        os.makedirs(os.path.join(self.cgroup_root, "user.slice", "cgroup.procs"))
+        os.makedirs(os.path.join(self.cgroup_root, "cgroup.procs"))
+        result = self.throttler.restore()
+        self.assertIn("Could not restore ffmpeg (200)", result)
+        self.assertEqual(set(self.throttler._load_state()), {"200", "300"})
+
+    def test_exited_and_reused_pids_are_not_moved(self):
+        self.throttler.throttle(self.processes)
+        shutil.rmtree(os.path.join(self.proc_root, "200"))
+        self._write_stat(300, "python3", 9000)  # pid reused by another process
+        result = self.throttler.restore()
+        self.assertIn("ffmpeg (200) has exited", result)
+        self.assertIn("make (300) has exited", result)
+        self.assertFalse(os.path.exists(os.path.join(self.cgroup_root, "user.slice", "session-3.scope", "cgroup.procs")))
+        self.assertEqual(self.throttler._load_state(), {})
+
+    def test_run_once_hysteresis(self):
+        self.throttler.throttle(self.processes)
+        self.assertEqual(self.throttler.run_once(threshold=80, load=70), "CPU usage 70.0%, no action needed")
+        self.assertIn("Restored", self.throttler.run_once(threshold=80, load=50))
+
+if __name__ == '__main__':
+    unittest.main()
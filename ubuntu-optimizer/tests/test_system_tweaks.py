@@ -1,10 +1,17 @@
+import os
+import tempfile
 import unittest
+from unittest import mock
 from src.features.system_tweaks import SystemTweaks
+from src.features.instrumentation import tracer
 
 class TestSystemTweaks(unittest.TestCase):
 
     def setUp(self):
-        self.system_tweaks = SystemTweaks()
+        root = tempfile.mkdtemp()
+        self.system_tweaks = SystemTweaks(proc_root=os.path.join(root, "proc"),
+                                          sysfs_root=os.path.join(root, "sys"),
+                                          state_dir=os.path.join(root, "state"))
 
     def test_apply_tweaks(self):
         result = self.system_tweaks.apply_tweaks()
@@ -15,5 +22,151 @@ class TestSystemTweaks(unittest.TestCase):
         result = self.system_tweaks.reset_tweaks()
         self.assertTrue(result)
 
+class TestPerformanceProfiles(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.proc_root = os.path.join(self.root, "proc")
+        self.sysfs_root = os.path.join(self.root, "sys")
+        self._write("proc/sys/vm/swappiness", "60")
+        self._write("proc/sys/vm/dirty_ratio", "20")
+        self._write("proc/sys/vm/dirty_background_ratio", "10")
+        self._write("proc/sys/vm/vfs_cache_pressure", "100")
+        self._write("sys/block/sda/queue/scheduler", "none [mq-deadline] bfq")
+        self._write("sys/block/loop0/queue/scheduler", "[none]")
+        self._write("sys/kernel/mm/transparent_hugepage/enabled", "[always] madvise never")
+        self._write("sys/devices/system/cpu/cpu0/cpufreq/scaling_governor", "powersave")
+        self._write("sys/devices/system/cpu/cpu1/cpufreq/scaling_governor", "powersave")
+        for cpu in ("cpu0", "cpu1"):
+            self._write(f"sys/devices/system/cpu/{cpu}/cpufreq/scaling_available_governors",
+                        "conservative ondemand userspace powersave performance schedutil")
+        self.system_tweaks = SystemTweaks(proc_root=self.proc_root, sysfs_root=self.sysfs_root,
+                                          state_dir=os.path.join(self.root, "state"))
+
+    def _write(self, relative_path, content):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content + "\n")
+
+    def _read(self, relative_path):
+        with open(os.path.join(self.root, relative_path)) as f:
+            return f.read().strip()
+
+    def test_apply_profile(self):
+        result = self.system_tweaks.apply_tweaks("low_latency_desktop")
+        self.assertIn("0 failed", result)
+        self.assertEqual(self._read("proc/sys/vm/dirty_ratio"), "10")
+        self.assertEqual(self._read("sys/block/sda/queue/scheduler"), "bfq")
+        self.assertEqual(self._read("sys/kernel/mm/transparent_hugepage/enabled"), "madvise")
+        self.assertEqual(self._read("sys/devices/system/cpu/cpu1/cpufreq/scaling_governor"), "schedutil")
+        self.assertEqual(self.system_tweaks.verify_tweaks("low_latency_desktop"), [])
+
+    def test_unsupported_scheduler_is_skipped(self):
+        result = self.system_tweaks.apply_tweaks("low_latency_desktop")
+        self.assertIn("1 skipped", result)
+        self.assertEqual(self._read("sys/block/loop0/queue/scheduler"), "[none]")
+
+    def test_unavailable_governor_is_skipped(self):
+        # intel_pstate only offers two governors
+        for cpu in ("cpu0", "cpu1"):
+            self._write(f"sys/devices/system/cpu/{cpu}/cpufreq/scaling_available_governors", "performance powersave")
+        result = self.system_tweaks.apply_tweaks("low_latency_desktop")
+        self.assertIn("0 failed", result)
+        self.assertIn("3 skipped", result)
+        self.assertEqual(self._read("sys/devices/system/cpu/cpu0/cpufreq/scaling_governor"), "powersave")
+
+    def test_file_reads_are_traced(self):
+        tracer.start()
+        try:
+            self.system_tweaks.verify_tweaks("low_latency_desktop")
+        finally:
+            tracer.stop()
+        names = {span["name"] for span in tracer.spans}
+        self.assertIn("_read_raw", names)
+        self.assertNotIn("_sysctl_path", names)
+
+    def test_reset_restores_original_values(self):
+        self.system_tweaks.apply_tweaks("throughput_server")
+        self.system_tweaks.apply_tweaks("build_machine")
+        result = self.system_tweaks.reset_tweaks()
+        self.assertIn("restored", result)
+        self.assertEqual(self._read("proc/sys/vm/swappiness"), "60")
+        self.assertEqual(self._read("proc/sys/vm/vfs_cache_pressure"), "100")
+        self.assertEqual(self._read("sys/block/sda/queue/scheduler"), "mq-deadline")
+        self.assertEqual(self._read("sys/kernel/mm/transparent_hugepage/enabled"), "always")
+        self.assertEqual(self._read("sys/devices/system/cpu/cpu0/cpufreq/scaling_governor"), "powersave")
+        self.assertEqual(self.system_tweaks.reset_tweaks(), "No tweaks to reset")
+
+    def test_reset_restores_dirty_bytes(self):
+        self._write("proc/sys/vm/dirty_ratio", "0")
+        self._write("proc/sys/vm/dirty_bytes", "268435456")
+        self._write("proc/sys/vm/dirty_background_bytes", "0")
+        self.system_tweaks.apply_tweaks("throughput_server")
+        # The kernel clears the byte limit when the ratio is written
+        self._write("proc/sys/vm/dirty_bytes", "0")
+
+        result = self.system_tweaks.reset_tweaks()
+        self.assertIn("restored", result)
+        self.assertEqual(self._read("proc/sys/vm/dirty_bytes"), "268435456")
+        self.assertEqual(self._read("proc/sys/vm/dirty_ratio"), "40")
+        self.assertEqual(self._read("proc/sys/vm/dirty_background_ratio"), "10")
+        self.assertEqual(self._read("proc/sys/vm/dirty_background_bytes"), "0")
+
+    def test_unknown_profile(self):
+        self.assertEqual(self.system_tweaks.apply_tweaks("gaming"), "Profile 'gaming' not found")
+
+    def test_read_counters(self):
+        self._write("proc/stat", "cpu  100 0 50 800 40 0 10 0 0 0\nprocs_running 3")
+        self._write("proc/vmstat", "pgfault 5000\npgmajfault 12")
+        self._write("proc/pressure/memory", "some avg10=1.50 avg60=0.80 avg300=0.20 total=1234\n"
+                                            "full avg10=0.50 avg60=0.10 avg300=0.00 total=99")
+        counters = self.system_tweaks._read_counters()
+        self.assertEqual(counters["cpu_total"], 1000)
+        self.assertEqual(counters["cpu_iowait"], 40)
+        self.assertEqual(counters["procs_running"], 3)
+        self.assertEqual(counters["major_faults"], 12)
+        self.assertEqual(counters["memory_stall_us"], 1234)
+
+    def test_sample_metrics_uses_counter_deltas(self):
+        self._write("proc/stat", "cpu  100 0 50 800 40 0 10 0 0 0\nprocs_running 3")
+        self._write("proc/vmstat", "pgmajfault 12")
+        self._write("proc/pressure/memory", "some avg10=0.00 avg60=0.00 avg300=0.00 total=1000000")
+
+        def advance(seconds):
+            self._write("proc/stat", "cpu  200 0 100 1500 150 0 50 0 0 0\nprocs_running 5")
+            self._write("proc/vmstat", "pgmajfault 112")
+            self._write("proc/pressure/memory", "some avg10=0.00 avg60=0.00 avg300=0.00 total=1500000")
+
+        with mock.patch("src.features.system_tweaks.time.sleep", side_effect=advance):
+            metrics = self.system_tweaks.sample_metrics(interval=10, readings=2)
+
+        self.assertAlmostEqual(metrics["memory_pressure"], 5.0)
+        self.assertAlmostEqual(metrics["iowait"], 110 * 100.0 / 1000)
+        self.assertAlmostEqual(metrics["major_faults"], 10.0)
+        self.assertAlmostEqual(metrics["run_queue"], 4 / (os.cpu_count() or 1))
+
+    def test_auto_tune_keeps_improvements_and_reverts_regressions(self):
+        def sampler(interval):
+            # Lower swappiness helps, anything else makes no difference
+            swappiness = int(self._read("proc/sys/vm/swappiness"))
+            return {"memory_pressure": swappiness / 10.0}
+
+        result = self.system_tweaks.auto_tune(iterations=8, interval=0, sampler=sampler)
+        self.assertIn("reverted", result)
+        self.assertEqual(self._read("proc/sys/vm/swappiness"), "50")
+        self.assertEqual(self._read("proc/sys/vm/dirty_ratio"), "20")
+        self.assertEqual(self._read("proc/sys/vm/vfs_cache_pressure"), "100")
+
+        self.system_tweaks.reset_tweaks()
+        self.assertEqual(self._read("proc/sys/vm/swappiness"), "60")
+
+    def test_auto_tune_skips_ratio_when_byte_limit_is_set(self):
+        self._write("proc/sys/vm/dirty_ratio", "0")
+        self._write("proc/sys/vm/dirty_bytes", "268435456")
+        self.system_tweaks.auto_tune(iterations=8, interval=0, sampler=lambda interval: {"iowait": 1.0})
+        self.assertEqual(self._read("proc/sys/vm/dirty_ratio"), "0")
+        self.assertEqual(self._read("proc/sys/vm/dirty_bytes"), "268435456")
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()